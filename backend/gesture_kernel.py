@@ -0,0 +1,151 @@
+"""Numba-compiled scoring kernel for the rule-based gesture classifier.
+
+The kernel is compiled eagerly from its explicit signature when this module
+is imported, and ``cache=True`` stores the machine code next to the module so
+later server starts skip the compile step. The cache (``__pycache__/*.nbi``
+and ``*.nbc``) can be shipped with a deployment, or pointed at a writable
+location with ``NUMBA_CACHE_DIR`` when the source tree is read-only.
+"""
+import numpy as np
+from numba import njit
+
+# Gesture names, indexed by the best_idx that score_all returns
+GESTURE_NAMES = (
+    "hello",
+    "thank_you",
+    "yes",
+    "no",
+    "help",
+    "stop",
+    "please",
+    "water",
+    "more",
+    "finished",
+)
+
+# Landmark indices for fingertips (thumb, index, middle, ring, pinky)
+TIP_IDX = np.array([4, 8, 12, 16, 20])
+
+# Bits of the finger-extension mask: bit 0 is the thumb, bits 1-4 the fingers
+THUMB_MASK = 0b00001
+INDEX_MASK = 0b00010
+FINGERS_MASK = 0b11110
+
+# Wrist height thresholds as float32, the dtype of the landmarks. Against
+# float64 literals, a float32 wrist y of 0.3 (0.30000001...) or 0.7
+# (0.69999998...) would fall on the other side of the threshold from the
+# value the client sent.
+PALM_Y_FACE = np.float32(0.3)
+PALM_Y_MOUTH = np.float32(0.4)
+PALM_Y_CHEST = np.float32(0.7)
+
+
+@njit(cache=True, inline="always")
+def popcount(mask):
+    """Count the set bits of an 8-bit mask without branching (SWAR)."""
+    mask = mask - ((mask >> 1) & 0x55)
+    mask = (mask & 0x33) + ((mask >> 2) & 0x33)
+    return (mask + (mask >> 4)) & 0x0F
+
+
+@njit("Tuple((int32, float64))(float32[:, ::1])", cache=True)
+def score_all(landmarks):
+    """Score every gesture for one hand of 21x3 landmarks.
+
+    Returns ``(best_idx, best_conf)`` where ``best_idx`` indexes
+    ``GESTURE_NAMES``, or -1 if no gesture beats the 0.1 baseline.
+    """
+    # Which fingers are extended: the thumb extends sideways, the others up
+    mask = (
+        int(landmarks[4, 0] > landmarks[3, 0])
+        | int(landmarks[8, 1] < landmarks[6, 1]) << 1
+        | int(landmarks[12, 1] < landmarks[10, 1]) << 2
+        | int(landmarks[16, 1] < landmarks[14, 1]) << 3
+        | int(landmarks[20, 1] < landmarks[18, 1]) << 4
+    )
+    # Computed once and shared by every rule below
+    sum_ext = popcount(mask)
+    sum_fingers = popcount(mask & FINGERS_MASK)
+
+    palm_y = landmarks[0, 1]  # Wrist Y coordinate
+    palm_z = landmarks[0, 2]  # Wrist Z coordinate
+
+    # hello - open hand waving: all fingers extended
+    if sum_ext >= 4:
+        hello = 0.8
+    else:
+        hello = 0.2
+
+    # thank you - hand near chin/mouth, i.e. in the upper part of the frame
+    if palm_y < PALM_Y_FACE:
+        thank_you = 0.7
+    else:
+        thank_you = 0.2
+
+    # yes - thumbs up: thumb extended, other fingers down
+    if mask == THUMB_MASK:
+        yes = 0.8
+    else:
+        yes = 0.2
+
+    # no - index finger wagging: only the index finger extended
+    if mask == INDEX_MASK:
+        no = 0.7
+    else:
+        no = 0.2
+
+    # help - open palm facing forward
+    if sum_ext >= 3 and palm_z < 0:
+        help_ = 0.6
+    else:
+        help_ = 0.2
+
+    # stop - flat hand, palm out: all fingers except the thumb extended
+    if sum_fingers >= 3:
+        stop = 0.7
+    else:
+        stop = 0.2
+
+    # please - flat hand on chest, in the middle of the frame
+    if sum_ext >= 3 and PALM_Y_FACE < palm_y < PALM_Y_CHEST:
+        please = 0.6
+    else:
+        please = 0.2
+
+    # water - cupped hand near mouth
+    if sum_ext <= 2 and palm_y < PALM_Y_MOUTH:
+        water = 0.6
+    else:
+        water = 0.2
+
+    # more - fingertips touching: every tip close to their common center
+    center_x = (landmarks[4, 0] + landmarks[8, 0] + landmarks[12, 0] + landmarks[16, 0] + landmarks[20, 0]) * 0.2
+    center_y = (landmarks[4, 1] + landmarks[8, 1] + landmarks[12, 1] + landmarks[16, 1] + landmarks[20, 1]) * 0.2
+    # Branch-free AND over the fixed five tips so LLVM can unroll and vectorize
+    # it. Squared distances are compared against 0.1 ** 2, so no square roots
+    # are needed, and a NaN distance fails the test just as it did with all().
+    all_close = True
+    for i in range(5):
+        dx = landmarks[TIP_IDX[i], 0] - center_x
+        dy = landmarks[TIP_IDX[i], 1] - center_y
+        all_close &= dx * dx + dy * dy < 0.01
+    if all_close:
+        more = 0.7
+    else:
+        more = 0.2
+
+    # finished - open hand, moderate confidence
+    if sum_ext >= 3:
+        finished = 0.5
+    else:
+        finished = 0.2
+
+    confidences = (hello, thank_you, yes, no, help_, stop, please, water, more, finished)
+    best_idx = -1
+    best_conf = 0.1
+    for i in range(len(confidences)):
+        if confidences[i] > best_conf:
+            best_idx = i
+            best_conf = confidences[i]
+
+    return best_idx, min(best_conf, 0.95)  # Cap confidence at 95%
@@ -1,5 +1,5 @@
-from fastapi import FastAPI, APIRouter, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -9,8 +9,27 @@ from pathlib import Path
 from pydantic import BaseModel, Field
 from typing import List, Optional
 import uuid
+import hashlib
+import random
 from datetime import datetime, timezone
 import json
+import orjson
+import msgspec
+import asyncio
+import numpy as np
+import ahocorasick
+
+from gesture_kernel import GESTURE_NAMES, score_all
+
+
+# Configure logging before anything below can log. force=True replaces any
+# handlers already on the root logger so records are not emitted twice.
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    force=True
+)
+logger = logging.getLogger(__name__)
 
 
 ROOT_DIR = Path(__file__).parent
@@ -21,8 +40,21 @@ mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
 
+class SignBridgeJSONResponse(ORJSONResponse):
+    """orjson-rendered response; naive datetimes (as returned by Motor) are encoded as UTC
+    
+    Routes that return models go through FastAPI's jsonable_encoder first, so
+    the datetime option only applies to content handed to this class directly.
+    """
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NAIVE_UTC)
+
 # Create the main app
-app = FastAPI(title="SignBridge API", description="AI-powered sign language translator")
+app = FastAPI(
+    title="SignBridge API",
+    description="AI-powered sign language translator",
+    default_response_class=SignBridgeJSONResponse
+)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -34,10 +66,17 @@ class HandLandmark(BaseModel):
     y: float
     z: float
 
-class SignPredictionRequest(BaseModel):
+# Decoded with msgspec rather than Pydantic, see /predict
+class SignPredictionRequest(msgspec.Struct):
     landmarks: List[List[float]]  # 21 landmarks, each with [x, y, z]
     handedness: Optional[str] = "Right"
 
+sign_prediction_decoder = msgspec.json.Decoder(SignPredictionRequest)
+SIGN_PREDICTION_REQUEST_SCHEMA = msgspec.json.schema(SignPredictionRequest)["$defs"]["SignPredictionRequest"]
+
+# Size of a /predict_bin body: 21 landmarks of x, y, z as float32
+LANDMARK_BUFFER_SIZE = 21 * 3 * 4
+
 class SignPredictionResponse(BaseModel):
     gesture: str
     confidence: float
@@ -51,148 +90,25 @@ class TextToSignResponse(BaseModel):
     text: str
     supported: bool
 
+# Shape of the documents in db.conversations, as queued by queue_conversation
+# and returned by /conversations (documented in OpenAPI, not validated)
 class ConversationEntry(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str  # uuid4().hex, assigned by queue_conversation
     message: str
     type: str  # "sign_to_text" or "text_to_sign"
     confidence: Optional[float] = None
-    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: datetime
 
 
 # Sign language gesture recognition using rule-based approach
 class GestureClassifier:
-    def __init__(self):
-        # Define basic gesture patterns based on hand landmarks
-        self.gestures = {
-            "hello": self._check_hello,
-            "thank_you": self._check_thank_you,
-            "yes": self._check_yes,
-            "no": self._check_no,
-            "help": self._check_help,
-            "stop": self._check_stop,
-            "please": self._check_please,
-            "water": self._check_water,
-            "more": self._check_more,
-            "finished": self._check_finished
-        }
-    
     def predict(self, landmarks):
-        """Predict gesture based on hand landmarks"""
-        if not landmarks or len(landmarks) < 21:
+        """Predict gesture based on hand landmarks (21x3 float32 array)"""
+        if landmarks is None or landmarks.ndim != 2 or landmarks.shape[0] < 21 or landmarks.shape[1] < 3:
             return "unknown", 0.1
         
-        best_gesture = "unknown"
-        best_confidence = 0.1
-        
-        for gesture_name, check_func in self.gestures.items():
-            confidence = check_func(landmarks)
-            if confidence > best_confidence:
-                best_gesture = gesture_name
-                best_confidence = confidence
-        
-        return best_gesture, min(best_confidence, 0.95)  # Cap confidence at 95%
-    
-    def _get_finger_extended(self, landmarks):
-        """Check which fingers are extended based on landmarks"""
-        # Landmark indices for fingertips and joints
-        tip_ids = [4, 8, 12, 16, 20]  # thumb, index, middle, ring, pinky tips
-        pip_ids = [3, 6, 10, 14, 18]  # corresponding joints
-        
-        extended = []
-        for i, (tip_id, pip_id) in enumerate(zip(tip_ids, pip_ids)):
-            if i == 0:  # Thumb
-                extended.append(landmarks[tip_id][0] > landmarks[pip_id][0])
-            else:  # Other fingers
-                extended.append(landmarks[tip_id][1] < landmarks[pip_id][1])
-        
-        return extended
-    
-    def _check_hello(self, landmarks):
-        """Check for hello gesture - open hand waving"""
-        extended = self._get_finger_extended(landmarks)
-        # All fingers extended
-        if sum(extended) >= 4:
-            return 0.8
-        return 0.2
-    
-    def _check_thank_you(self, landmarks):
-        """Check for thank you gesture - hand near chin/mouth"""
-        # Check if hand is near face area (higher Y coordinate)
-        palm_y = landmarks[0][1]  # Wrist Y coordinate
-        if palm_y < 0.3:  # Hand is in upper part of frame
-            return 0.7
-        return 0.2
-    
-    def _check_yes(self, landmarks):
-        """Check for yes gesture - nodding motion or thumbs up"""
-        extended = self._get_finger_extended(landmarks)
-        # Thumb up, other fingers down
-        if extended[0] and not any(extended[1:]):
-            return 0.8
-        return 0.2
-    
-    def _check_no(self, landmarks):
-        """Check for no gesture - index finger wagging"""
-        extended = self._get_finger_extended(landmarks)
-        # Only index finger extended
-        if not extended[0] and extended[1] and not any(extended[2:]):
-            return 0.7
-        return 0.2
-    
-    def _check_help(self, landmarks):
-        """Check for help gesture - open palm facing forward"""
-        extended = self._get_finger_extended(landmarks)
-        palm_z = landmarks[0][2]  # Wrist Z coordinate
-        if sum(extended) >= 3 and palm_z < 0:  # Palm facing forward
-            return 0.6
-        return 0.2
-    
-    def _check_stop(self, landmarks):
-        """Check for stop gesture - flat hand, palm out"""
-        extended = self._get_finger_extended(landmarks)
-        # All fingers except thumb extended, palm out
-        if sum(extended[1:]) >= 3:
-            return 0.7
-        return 0.2
-    
-    def _check_please(self, landmarks):
-        """Check for please gesture - flat hand on chest"""
-        extended = self._get_finger_extended(landmarks)
-        palm_y = landmarks[0][1]
-        # Flat hand in middle area
-        if sum(extended) >= 3 and 0.3 < palm_y < 0.7:
-            return 0.6
-        return 0.2
-    
-    def _check_water(self, landmarks):
-        """Check for water gesture - cupped hand near mouth"""
-        extended = self._get_finger_extended(landmarks)
-        palm_y = landmarks[0][1]
-        # Curved hand near mouth area
-        if sum(extended) <= 2 and palm_y < 0.4:
-            return 0.6
-        return 0.2
-    
-    def _check_more(self, landmarks):
-        """Check for more gesture - fingertips touching"""
-        # Check if fingertips are close together
-        fingertips = [landmarks[i] for i in [4, 8, 12, 16, 20]]
-        center_x = sum(tip[0] for tip in fingertips) / 5
-        center_y = sum(tip[1] for tip in fingertips) / 5
-        
-        # Check if all fingertips are close to center
-        distances = [((tip[0] - center_x)**2 + (tip[1] - center_y)**2)**0.5 for tip in fingertips]
-        if all(d < 0.1 for d in distances):
-            return 0.7
-        return 0.2
-    
-    def _check_finished(self, landmarks):
-        """Check for finished gesture - hands apart/done"""
-        extended = self._get_finger_extended(landmarks)
-        # Open hand with moderate confidence
-        if sum(extended) >= 3:
-            return 0.5
-        return 0.2
+        idx, confidence = score_all(np.ascontiguousarray(landmarks[:21], dtype=np.float32))
+        return (GESTURE_NAMES[idx] if confidence > 0.1 else "unknown"), confidence
 
 
 # Initialize gesture classifier
@@ -216,67 +132,200 @@ SIGN_ANIMATIONS = {
     "nice to meet you": "nice_to_meet.gif"
 }
 
+# Normalized phrase -> (phrase, animation) map, plus an Aho-Corasick
+# automaton that finds every supported phrase in a text in a single pass
+NORMALIZED_ANIMATIONS = {phrase.lower(): (phrase, key) for phrase, key in SIGN_ANIMATIONS.items()}
+phrase_automaton = ahocorasick.Automaton()
+for phrase, match in NORMALIZED_ANIMATIONS.items():
+    phrase_automaton.add_word(phrase, match)
+phrase_automaton.make_automaton()
+
+def text_to_sign_lookup(text):
+    """Find the animation for a text, returning (animation_key, supported)"""
+    text_lower = text.lower().strip()
+    
+    # Check if we have animation for this text
+    match = NORMALIZED_ANIMATIONS.get(text_lower)
+    
+    if match is None:
+        # Use the longest supported phrase contained in the text
+        for _, candidate in phrase_automaton.iter(text_lower):
+            if match is None or len(candidate[0]) > len(match[0]):
+                match = candidate
+    
+    if match is None:
+        # Fall back to a supported phrase that contains the text
+        for phrase, candidate in NORMALIZED_ANIMATIONS.items():
+            if text_lower in phrase:
+                match = candidate
+                break
+    
+    if match is None:
+        return "not_supported.gif", False
+    return match[1], True
+
+
+# The supported signs never change at runtime, so /supported-signs serves
+# pre-encoded bytes that clients and proxies may cache
+SUPPORTED_SIGNS_BYTES = orjson.dumps({
+    "signs": list(GESTURE_NAMES),
+    "phrases": list(SIGN_ANIMATIONS.keys()),
+    "total_signs": len(GESTURE_NAMES),
+    "total_phrases": len(SIGN_ANIMATIONS)
+})
+SUPPORTED_SIGNS_HEADERS = {
+    "Cache-Control": "public, max-age=3600",
+    "ETag": f'"{hashlib.sha256(SUPPORTED_SIGNS_BYTES).hexdigest()[:32]}"'
+}
+
+# Fields returned by /conversations
+CONVERSATION_PROJECTION = {"_id": 0, "id": 1, "message": 1, "type": 1, "confidence": 1, "timestamp": 1}
+
+# Conversation entries are queued by the handlers and written in batches
+CONV_BATCH_SIZE = 100
+CONV_FLUSH_INTERVAL = 0.2  # seconds
+# Bounds memory while MongoDB is unreachable; entries beyond it are dropped
+CONV_QUEUE_MAXSIZE = 10000
+# How long shutdown waits for queued entries to be written
+CONV_SHUTDOWN_TIMEOUT = 5.0  # seconds
+
+# Fraction of sign predictions kept in the conversation history
+CONV_SAMPLE_RATE = float(os.environ.get('CONV_SAMPLE_RATE', '1.0'))
+
+async def flush_conversations(queue: asyncio.Queue):
+    """Drain queued conversation entries into MongoDB with insert_many"""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await queue.get()]
+        deadline = loop.time() + CONV_FLUSH_INTERVAL
+        while len(batch) < CONV_BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        
+        try:
+            await db.conversations.insert_many(batch, ordered=False)
+        except asyncio.CancelledError:
+            logger.warning(f"Dropping {len(batch)} conversation entries that were being written")
+            raise
+        except Exception as e:
+            logger.error(f"Error storing {len(batch)} conversation entries: {str(e)}", exc_info=True)
+        finally:
+            for _ in batch:
+                queue.task_done()
+
+def queue_conversation(message, entry_type, confidence, now):
+    """Queue a ConversationEntry document for the batch writer"""
+    try:
+        app.state.conv_queue.put_nowait({
+            "id": uuid.uuid4().hex,
+            "message": message,
+            "type": entry_type,
+            "confidence": confidence,
+            "timestamp": now
+        })
+    except asyncio.QueueFull:
+        logger.warning(f"Conversation queue full, dropping {entry_type} entry")
+
 
 # API Routes
 @api_router.get("/")
 async def root():
     return {"message": "SignBridge API - AI-powered Sign Language Translator", "version": "1.0.0"}
 
-@api_router.post("/predict", response_model=SignPredictionResponse)
-async def predict_sign(request: SignPredictionRequest):
+def require_finite(landmarks):
+    """Reject NaN/inf landmarks, which would otherwise classify as a real gesture"""
+    if not np.isfinite(landmarks).all():
+        raise HTTPException(status_code=400, detail="Landmarks must be finite numbers")
+
+def predict_and_record(landmarks, now):
+    """Classify a (21, 3) landmark array and queue the conversation entry"""
+    # Predict gesture using rule-based classifier
+    gesture, confidence = gesture_classifier.predict(landmarks)
+    
+    # Store a sample of conversation entries
+    if random.random() < CONV_SAMPLE_RATE:
+        queue_conversation(gesture, "sign_to_text", confidence, now)
+    
+    return SignPredictionResponse(
+        gesture=gesture,
+        confidence=confidence,
+        timestamp=now
+    )
+
+@api_router.post(
+    "/predict",
+    response_model=SignPredictionResponse,
+    openapi_extra={"requestBody": {"required": True, "content": {"application/json": {"schema": SIGN_PREDICTION_REQUEST_SCHEMA}}}}
+)
+async def predict_sign(request: Request):
     """Predict sign language gesture from hand landmarks"""
+    now = datetime.now(timezone.utc)
     try:
-        if not request.landmarks:
-            raise HTTPException(status_code=400, detail="No landmarks provided")
-        
-        # Predict gesture using rule-based classifier
-        gesture, confidence = gesture_classifier.predict(request.landmarks)
-        
-        # Store conversation entry
-        entry = ConversationEntry(
-            message=gesture,
-            type="sign_to_text",
-            confidence=confidence
-        )
-        await db.conversations.insert_one(entry.dict())
+        payload = sign_prediction_decoder.decode(await request.body())
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    if not payload.landmarks:
+        raise HTTPException(status_code=400, detail="No landmarks provided")
+    
+    try:
+        # Values beyond float32 range become inf and are rejected below
+        with np.errstate(over="ignore"):
+            landmarks = np.asarray(payload.landmarks, dtype=np.float32)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Every landmark must have the same number of coordinates")
+    require_finite(landmarks)
+    
+    try:
+        return predict_and_record(landmarks, now)
         
-        return SignPredictionResponse(
-            gesture=gesture,
-            confidence=confidence
+    except Exception as e:
+        logger.error(f"Error predicting sign: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Error processing sign prediction")
+
+@api_router.post(
+    "/predict_bin",
+    response_model=SignPredictionResponse,
+    openapi_extra={"requestBody": {"required": True, "content": {"application/octet-stream": {"schema": {"type": "string", "format": "binary"}}}}}
+)
+async def predict_sign_binary(request: Request):
+    """Predict sign language gesture from packed hand landmarks
+    
+    The body is 21 * 3 little-endian float32 values: x, y, z of each landmark in order.
+    """
+    now = datetime.now(timezone.utc)
+    body = await request.body()
+    if len(body) != LANDMARK_BUFFER_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Expected {LANDMARK_BUFFER_SIZE} bytes of landmarks (21 x 3 little-endian float32)"
         )
+    
+    # astype copies into a writable, native-endian array for the kernel
+    landmarks = np.frombuffer(body, dtype="<f4").astype(np.float32).reshape(21, 3)
+    require_finite(landmarks)
+    
+    try:
+        return predict_and_record(landmarks, now)
         
     except Exception as e:
-        logger.error(f"Error predicting sign: {str(e)}")
+        logger.error(f"Error predicting sign: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Error processing sign prediction")
 
 @api_router.post("/text-to-sign", response_model=TextToSignResponse)
 async def text_to_sign(request: TextToSignRequest):
     """Convert text to sign language animation"""
+    now = datetime.now(timezone.utc)
     try:
-        text_lower = request.text.lower().strip()
-        
-        # Check if we have animation for this text
-        animation_key = SIGN_ANIMATIONS.get(text_lower)
-        supported = animation_key is not None
-        
-        if not supported:
-            # Try to find partial matches for common phrases
-            for phrase, key in SIGN_ANIMATIONS.items():
-                if phrase in text_lower or text_lower in phrase:
-                    animation_key = key
-                    supported = True
-                    break
-        
-        if not animation_key:
-            animation_key = "not_supported.gif"
+        animation_key, supported = text_to_sign_lookup(request.text)
         
         # Store conversation entry
-        entry = ConversationEntry(
-            message=request.text,
-            type="text_to_sign",
-            confidence=0.9 if supported else 0.1
-        )
-        await db.conversations.insert_one(entry.dict())
+        queue_conversation(request.text, "text_to_sign", 0.9 if supported else 0.1, now)
         
         return TextToSignResponse(
             animation_key=animation_key,
@@ -285,17 +334,19 @@ async def text_to_sign(request: TextToSignRequest):
         )
         
     except Exception as e:
-        logger.error(f"Error converting text to sign: {str(e)}")
+        logger.error(f"Error converting text to sign: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Error processing text to sign conversion")
 
-@api_router.get("/conversations", response_model=List[ConversationEntry])
+@api_router.get("/conversations", responses={200: {"model": List[ConversationEntry]}})
 async def get_conversations():
     """Get conversation history"""
     try:
-        conversations = await db.conversations.find().sort("timestamp", -1).limit(50).to_list(50)
-        return [ConversationEntry(**conv) for conv in conversations]
+        conversations = await db.conversations.find({}, CONVERSATION_PROJECTION).sort("timestamp", -1).limit(50).to_list(50)
+        # Returning the response directly skips FastAPI's jsonable_encoder
+        # pass, so orjson encodes Motor's naive BSON datetimes as UTC
+        return SignBridgeJSONResponse(content=conversations)
     except Exception as e:
-        logger.error(f"Error fetching conversations: {str(e)}")
+        logger.error(f"Error fetching conversations: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Error fetching conversation history")
 
 @api_router.delete("/conversations")
@@ -305,22 +356,25 @@ async def clear_conversations():
         result = await db.conversations.delete_many({})
         return {"message": f"Cleared {result.deleted_count} conversation entries"}
     except Exception as e:
-        logger.error(f"Error clearing conversations: {str(e)}")
+        logger.error(f"Error clearing conversations: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Error clearing conversations")
 
 @api_router.get("/supported-signs")
-async def get_supported_signs():
+async def get_supported_signs(request: Request):
     """Get list of supported sign language gestures"""
-    return {
-        "signs": list(gesture_classifier.gestures.keys()),
-        "phrases": list(SIGN_ANIMATIONS.keys()),
-        "total_signs": len(gesture_classifier.gestures),
-        "total_phrases": len(SIGN_ANIMATIONS)
-    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if "*" in tags or SUPPORTED_SIGNS_HEADERS["ETag"] in tags:
+            return Response(status_code=304, headers=SUPPORTED_SIGNS_HEADERS)
+    
+    return Response(SUPPORTED_SIGNS_BYTES, media_type="application/json", headers=SUPPORTED_SIGNS_HEADERS)
 
 @api_router.get("/health")
-async def health_check():
+async def health_check(response: Response):
     """Health check endpoint"""
+    # Health must reflect the live server, never a cached copy
+    response.headers["Cache-Control"] = "no-store"
     return {
         "status": "healthy",
         "service": "SignBridge API",
@@ -336,21 +390,56 @@ async def health_check():
 # Include the router in the main app
 app.include_router(api_router)
 
+# Drop blanks and stray whitespace so "*" reliably takes the allow-all path
+cors_origins = [origin.strip() for origin in os.environ.get('CORS_ORIGINS', '*').split(',') if origin.strip()]
+if '*' in cors_origins:
+    cors_origins = ['*']
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
-    allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
+    allow_origins=cors_origins,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
+@app.on_event("startup")
+async def warm_up():
+    # score_all is compiled and the phrase automaton built at import; this is
+    # only a safety net that runs each request path once before traffic.
+    # "say hello" misses the exact-phrase map, so it goes through the automaton.
+    gesture_classifier.predict(np.zeros((21, 3), dtype=np.float32))
+    text_to_sign_lookup("say hello")
+
+async def create_indexes():
+    # Lets /conversations read the newest entries without a collection scan
+    try:
+        await db.conversations.create_index([("timestamp", -1)])
+    except Exception as e:
+        logger.error(f"Error creating conversation indexes: {str(e)}", exc_info=True)
+
+@app.on_event("startup")
+async def start_index_creation():
+    # Run in the background so an unreachable MongoDB doesn't delay startup
+    app.state.index_task = asyncio.create_task(create_indexes())
+
+@app.on_event("startup")
+async def start_conversation_writer():
+    app.state.conv_queue = asyncio.Queue(maxsize=CONV_QUEUE_MAXSIZE)
+    app.state.conv_writer = asyncio.create_task(flush_conversations(app.state.conv_queue))
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    # Write out any entries still queued before closing the connection, but
+    # don't hang on an unreachable MongoDB
+    try:
+        await asyncio.wait_for(app.state.conv_queue.join(), timeout=CONV_SHUTDOWN_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning(
+            f"Dropping {app.state.conv_queue.qsize()} queued conversation entries "
+            f"after waiting {CONV_SHUTDOWN_TIMEOUT}s on shutdown"
+        )
+    app.state.conv_writer.cancel()
+    app.state.index_task.cancel()
+    await asyncio.gather(app.state.conv_writer, app.state.index_task, return_exceptions=True)
     client.close()
\ No newline at end of file
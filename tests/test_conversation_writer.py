@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+import server
+
+
+class FakeConversations:
+    """Stand-in for db.conversations whose insert_many can succeed, raise or hang"""
+    def __init__(self, mode="ok"):
+        self.mode = mode
+        self.batches = []
+
+    async def insert_many(self, docs, ordered=True):
+        if self.mode == "hang":
+            await asyncio.sleep(3600)
+        self.batches.append(len(docs))
+        if self.mode == "raise":
+            raise RuntimeError("server selection timeout")
+
+    async def create_index(self, *args, **kwargs):
+        return "timestamp_-1"
+
+
+class FakeDB:
+    def __init__(self, conversations):
+        self.conversations = conversations
+
+
+class FakeClient:
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def conversations(monkeypatch):
+    fake = FakeConversations()
+    monkeypatch.setattr(server, "db", FakeDB(fake))
+    monkeypatch.setattr(server, "client", FakeClient())
+    return fake
+
+
+def entry(i=0):
+    return {"id": str(i), "message": "hello", "type": "sign_to_text",
+            "confidence": 0.8, "timestamp": datetime.now(timezone.utc)}
+
+
+async def drain(queue, timeout=2.0):
+    writer = asyncio.create_task(server.flush_conversations(queue))
+    try:
+        await asyncio.wait_for(queue.join(), timeout)
+    finally:
+        writer.cancel()
+        await asyncio.gather(writer, return_exceptions=True)
+
+
+def test_batches_are_capped(conversations):
+    async def run():
+        queue = asyncio.Queue()
+        for i in range(2 * server.CONV_BATCH_SIZE + 50):
+            queue.put_nowait(entry(i))
+        await drain(queue)
+
+    asyncio.run(run())
+    assert conversations.batches == [server.CONV_BATCH_SIZE, server.CONV_BATCH_SIZE, 50]
+
+
+def test_entries_within_flush_interval_share_a_batch(conversations):
+    async def run():
+        queue = asyncio.Queue()
+        writer = asyncio.create_task(server.flush_conversations(queue))
+        start = time.monotonic()
+        queue.put_nowait(entry(0))
+        await asyncio.sleep(server.CONV_FLUSH_INTERVAL / 4)
+        queue.put_nowait(entry(1))
+        await asyncio.wait_for(queue.join(), 2.0)
+        elapsed = time.monotonic() - start
+        writer.cancel()
+        await asyncio.gather(writer, return_exceptions=True)
+        return elapsed
+
+    elapsed = asyncio.run(run())
+    assert conversations.batches == [2]
+    # A partial batch is written once the flush interval has passed
+    assert server.CONV_FLUSH_INTERVAL * 0.9 <= elapsed < server.CONV_FLUSH_INTERVAL + 1.0
+
+
+def test_failed_write_still_marks_entries_done(conversations, caplog):
+    conversations.mode = "raise"
+
+    async def run():
+        queue = asyncio.Queue()
+        for i in range(3):
+            queue.put_nowait(entry(i))
+        await drain(queue)
+
+    asyncio.run(run())
+    assert conversations.batches == [3]
+    assert "Error storing 3 conversation entries" in caplog.text
+
+
+def test_full_queue_drops_entries(monkeypatch, caplog):
+    async def run():
+        queue = asyncio.Queue(maxsize=2)
+        monkeypatch.setattr(server.app.state, "conv_queue", queue, raising=False)
+        for _ in range(3):
+            server.queue_conversation("hello", "sign_to_text", 0.8, datetime.now(timezone.utc))
+        return queue.qsize()
+
+    with caplog.at_level(logging.WARNING):
+        assert asyncio.run(run()) == 2
+    assert "Conversation queue full" in caplog.text
+
+
+def test_shutdown_gives_up_on_hung_writes(conversations, monkeypatch, caplog):
+    conversations.mode = "hang"
+    monkeypatch.setattr(server, "CONV_SHUTDOWN_TIMEOUT", 0.3)
+
+    async def run():
+        queue = asyncio.Queue()
+        state = server.app.state
+        monkeypatch.setattr(state, "conv_queue", queue, raising=False)
+        monkeypatch.setattr(state, "conv_writer", asyncio.create_task(server.flush_conversations(queue)), raising=False)
+        monkeypatch.setattr(state, "index_task", asyncio.create_task(server.create_indexes()), raising=False)
+        # One full batch hangs in insert_many, five more wait in the queue
+        for i in range(server.CONV_BATCH_SIZE + 5):
+            queue.put_nowait(entry(i))
+        await asyncio.sleep(0)
+
+        start = time.monotonic()
+        await server.shutdown_db_client()
+        return time.monotonic() - start
+
+    with caplog.at_level(logging.WARNING):
+        elapsed = asyncio.run(run())
+    assert elapsed < server.CONV_SHUTDOWN_TIMEOUT + 1.0
+    assert "Dropping 5 queued conversation entries" in caplog.text
+    assert f"Dropping {server.CONV_BATCH_SIZE} conversation entries that were being written" in caplog.text
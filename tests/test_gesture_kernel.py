@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from gesture_kernel import score_all
+from server import gesture_classifier
+
+TIP_IDS = [4, 8, 12, 16, 20]
+PIP_IDS = [3, 6, 10, 14, 18]
+
+
+def make_hand(thumb=False, fingers=(), wrist=(0.5, 0.5, 0.1)):
+    """Build 21x3 landmarks with the given digits extended and tips spread apart"""
+    landmarks = np.full((21, 3), 0.5, dtype=np.float32)
+    landmarks[:, 2] = 0.0
+    landmarks[0] = wrist
+    for i, (tip, pip) in enumerate(zip(TIP_IDS, PIP_IDS)):
+        landmarks[tip, 0] = landmarks[pip, 0] = 0.1 + 0.2 * i
+        if i == 0:
+            # Thumb extends sideways: tip right of its joint
+            landmarks[pip, 0] += -0.05 if thumb else 0.05
+        else:
+            # Fingers extend upwards: tip above its joint
+            landmarks[tip, 1] = 0.3 if i in fingers else 0.7
+    return landmarks
+
+
+def make_pinch(offset):
+    """Fingertips bunched at (0.5, 0.5) except the pinky, offset in x"""
+    landmarks = make_hand()
+    for tip, pip in zip(TIP_IDS, PIP_IDS):
+        landmarks[tip, :2] = 0.5
+        landmarks[pip, 1] = 0.4  # Tips below their joints: nothing extended
+    landmarks[3, 0] = 0.6
+    landmarks[20, 0] += offset
+    return landmarks
+
+
+# Expected results are those of the original per-gesture _check_* rules
+# applied to the (float64) values a client sends
+@pytest.mark.parametrize("landmarks, expected", [
+    (make_hand(thumb=True, fingers=(1, 2, 3, 4)), ("hello", 0.8)),
+    (make_hand(wrist=(0.5, 0.2, 0.1)), ("thank_you", 0.7)),
+    (make_hand(thumb=True), ("yes", 0.8)),
+    (make_hand(fingers=(1,)), ("no", 0.7)),
+    (make_hand(thumb=True, fingers=(1, 2), wrist=(0.5, 0.8, -0.1)), ("help", 0.6)),
+    (make_hand(fingers=(1, 2, 3), wrist=(0.5, 0.8, 0.1)), ("stop", 0.7)),
+    (make_hand(thumb=True, fingers=(1, 2)), ("please", 0.6)),
+    (make_hand(wrist=(0.5, 0.35, 0.1)), ("water", 0.6)),
+    (make_pinch(0.0), ("more", 0.7)),
+    (make_hand(thumb=True, fingers=(1, 2), wrist=(0.5, 0.8, 0.1)), ("finished", 0.5)),
+    # Wrist heights on and just inside the thresholds
+    (make_hand(wrist=(0.5, 0.29, 0.1)), ("thank_you", 0.7)),
+    (make_hand(wrist=(0.5, 0.3, 0.1)), ("water", 0.6)),
+    (make_hand(wrist=(0.5, 0.39, 0.1)), ("water", 0.6)),
+    (make_hand(wrist=(0.5, 0.4, 0.1)), ("hello", 0.2)),
+    (make_hand(thumb=True, fingers=(1, 2), wrist=(0.5, 0.3, 0.1)), ("finished", 0.5)),
+    (make_hand(thumb=True, fingers=(1, 2), wrist=(0.5, 0.69, 0.1)), ("please", 0.6)),
+    (make_hand(thumb=True, fingers=(1, 2), wrist=(0.5, 0.7, 0.1)), ("finished", 0.5)),
+])
+def test_each_gesture_matches_rules(landmarks, expected):
+    assert gesture_classifier.predict(landmarks) == expected
+
+
+@pytest.mark.parametrize("thumb, fingers", [
+    (True, (1,)),   # Thumb and index: neither yes nor no
+    (False, (1, 2)),  # Index and middle: not no
+    (False, (2,)),  # Only middle: not no
+])
+def test_yes_no_need_exact_mask(thumb, fingers):
+    assert gesture_classifier.predict(make_hand(thumb=thumb, fingers=fingers)) == ("hello", 0.2)
+
+
+def test_more_threshold_edge():
+    # The pinky sits 4/5 of the offset from the fingertip center
+    assert gesture_classifier.predict(make_pinch(0.12)) == ("more", 0.7)
+    assert gesture_classifier.predict(make_pinch(0.13)) == ("hello", 0.2)
+
+
+def test_non_finite_landmarks_match_rules():
+    landmarks = np.full((21, 3), np.nan, dtype=np.float32)
+    assert gesture_classifier.predict(landmarks) == ("hello", 0.2)
+    assert score_all(landmarks) == score_all.py_func(landmarks)
+
+
+def test_extra_landmarks_are_ignored():
+    landmarks = make_hand(thumb=True)
+    padded = np.vstack([landmarks, np.zeros((4, 3), dtype=np.float32)])
+    assert gesture_classifier.predict(padded) == ("yes", 0.8)
+
+
+@pytest.mark.parametrize("landmarks", [
+    None,
+    np.zeros((20, 3), dtype=np.float32),  # Too few landmarks
+    np.zeros((21, 2), dtype=np.float32),  # Missing z
+    np.zeros(63, dtype=np.float32),  # Not a 2-D array
+])
+def test_malformed_landmarks_are_unknown(landmarks):
+    assert gesture_classifier.predict(landmarks) == ("unknown", 0.1)
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+
+
+class FakeConversations:
+    async def insert_many(self, docs, ordered=True):
+        pass
+
+    async def create_index(self, *args, **kwargs):
+        return "timestamp_-1"
+
+
+class FakeDB:
+    conversations = FakeConversations()
+
+
+class FakeClient:
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(server, "db", FakeDB())
+    monkeypatch.setattr(server, "client", FakeClient())
+    with TestClient(server.app) as test_client:
+        yield test_client
+
+
+def test_predict_json(client):
+    response = client.post("/api/predict", json={"landmarks": [[0.0, 0.0, 0.0]] * 21})
+    assert response.status_code == 200
+    assert response.json()["gesture"] == "thank_you"
+    assert response.json()["confidence"] == 0.7
+
+
+def test_predict_binary(client):
+    body = np.zeros((21, 3), dtype="<f4").tobytes()
+    assert len(body) == server.LANDMARK_BUFFER_SIZE == 252
+    response = client.post("/api/predict_bin", content=body)
+    assert response.status_code == 200
+    assert response.json()["gesture"] == "thank_you"
+    assert response.json()["confidence"] == 0.7
+
+
+@pytest.mark.parametrize("body", [b"", b"\0" * 251, b"\0" * 256])
+def test_predict_binary_wrong_length(client, body):
+    assert client.post("/api/predict_bin", content=body).status_code == 400
+
+
+@pytest.mark.parametrize("value", [np.nan, np.inf, -np.inf])
+def test_predict_binary_non_finite(client, value):
+    landmarks = np.zeros((21, 3), dtype="<f4")
+    landmarks[0, 1] = value
+    response = client.post("/api/predict_bin", content=landmarks.tobytes())
+    assert response.status_code == 400
+
+
+def test_predict_json_overflow_is_non_finite(client):
+    # 1e39 is beyond float32 range and becomes inf
+    response = client.post("/api/predict", json={"landmarks": [[1e39, 0.0, 0.0]] * 21})
+    assert response.status_code == 400
+
+
+def test_predict_json_empty(client):
+    response = client.post("/api/predict", json={"landmarks": []})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "No landmarks provided"
+
+
+@pytest.mark.parametrize("body", [
+    b'{"landmarks": [[1, 2], [1, 2, 3]]}',  # Ragged
+    b'{"landmarks": [[1, 2, 3',  # Malformed JSON
+    b'{"landmarks": "x"}',  # Wrong type
+    b'{"landmarks": [["0.5", 0.5, 0.5]]}',  # Numeric strings are not coerced
+    b'{}',  # Missing landmarks
+])
+def test_predict_json_invalid(client, body):
+    response = client.post("/api/predict", content=body, headers={"Content-Type": "application/json"})
+    assert response.status_code == 422
+    assert isinstance(response.json()["detail"], str)
@@ -0,0 +1,18 @@
+import pytest
+
+from server import text_to_sign_lookup
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("hello", ("wave_hello.gif", True)),
+    ("  Thank You ", ("thank_you.gif", True)),
+    # Several phrases in the text: the longest one wins
+    ("nice to meet you and hello", ("nice_to_meet.gif", True)),
+    ("hello, how are you", ("how_are_you.gif", True)),
+    # Text that is part of a supported phrase
+    ("good", ("good_morning.gif", True)),
+    ("thank", ("thank_you.gif", True)),
+    ("zzz", ("not_supported.gif", False)),
+])
+def test_text_to_sign_lookup(text, expected):
+    assert text_to_sign_lookup(text) == expected